@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""Publish recent Apple Notes to this site as Jekyll posts.
+
+Pulls notes modified in the last week out of Notes.app via AppleScript,
+converts them to Markdown posts under _posts/, copies any attached images
+into assets/images/, and commits the result.
+
+Usage:
+    python3 publish_notes.py
+"""
+
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import sqlite3
+import subprocess
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Each note is emitted as title/body/date separated by the ASCII unit
+# separator (0x1f) and terminated by the record separator (0x1e) --
+# control characters that cannot appear in note text, so the framing
+# never collides with content and needs no escaping or base64 detour.
+_FETCH_SCRIPT = '''
+on run
+    set fieldSep to character id 31
+    set recSep to character id 30
+    tell application "Notes"
+        set cutoff to (current date) - (7 * days)
+        repeat with theNote in notes of default account
+            if modification date of theNote > cutoff then
+                set recTitle to name of theNote as string
+                set recBody to body of theNote as string
+                set recDate to (modification date of theNote) as «class isot» as string
+                log recTitle & fieldSep & recBody & fieldSep & recDate & recSep
+            end if
+        end repeat
+    end tell
+end run
+'''
+
+_FIELD_SEP = b'\x1f'
+_RECORD_SEP = b'\x1e'
+
+
+# All Notes-to-Markdown rewrites fused into one alternation so the body
+# is scanned (and reallocated) once instead of once per rule. Dispatch on
+# match.lastgroup picks the replacement.
+_FUSED_RE = re.compile(
+    r'(?P<num>^\d+\.\s*)'
+    r'|(?P<ital>_[^_\n]+_)'
+    r'|(?P<bold>\*[^*\n]+\*)'
+    r'|(?P<tag>(?:^|\s)#\w+(?=\s|$))',
+    re.MULTILINE,
+)
+# One pass: any run of non-alphanumerics collapses straight to a dash.
+_SLUG_RE = re.compile(r'[^a-zA-Z0-9]+')
+
+# Checkbox glyphs are plain one-char literals; translate beats the regex
+# engine for those.
+_CHECKBOX_MAP = str.maketrans({'☐': '- [ ]', '☑': '- [x]'})
+
+# Attachment types worth copying; anything else (PDFs, audio, links)
+# is rejected before we even stat the file.
+_IMG_EXTS = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.heic', '.webp', '.tiff'})
+
+
+# Notes keeps everything in a Core Data SQLite store inside its group
+# container; reading it directly skips the per-note AppleScript IPC.
+_NOTE_STORE = '~/Library/Group Containers/group.com.apple.notes/NoteStore.sqlite'
+# Core Data timestamps count seconds from 2001-01-01, not the Unix epoch.
+_APPLE_EPOCH = 978307200
+
+
+_CTRL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _read_varint(buf, pos):
+    """Read one protobuf varint from buf at pos; return (value, new_pos)."""
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        value |= (byte & 0x7f) << shift
+        pos += 1
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _longest_text_field(buf):
+    """Return the longest UTF-8 string field in a protobuf message.
+
+    Walks the wire format with the varint length prefixes, so a field is
+    sliced to exactly its declared length -- no scanning for printable
+    runs, which would glue the length byte onto the text whenever it
+    happens to be printable ASCII. Length-delimited fields that are not
+    clean text are recursed into as nested messages.
+    """
+    best = ''
+    pos, end = 0, len(buf)
+    while pos < end:
+        try:
+            tag, pos = _read_varint(buf, pos)
+            wire = tag & 7
+            if wire == 0:
+                _, pos = _read_varint(buf, pos)
+            elif wire == 1:
+                pos += 8
+            elif wire == 5:
+                pos += 4
+            elif wire == 2:
+                length, pos = _read_varint(buf, pos)
+                if length < 0 or pos + length > end:
+                    break
+                chunk = buf[pos:pos + length]
+                pos += length
+                try:
+                    text = chunk.decode('utf-8')
+                except UnicodeDecodeError:
+                    text = None
+                if text is None or _CTRL_RE.search(text):
+                    text = _longest_text_field(chunk)
+                if len(text) > len(best):
+                    best = text
+            else:
+                break
+        except IndexError:
+            break
+    return best
+
+
+def _extract_note_text(zdata):
+    """Pull the plain-text body out of a gzipped ZDATA blob.
+
+    The decompressed payload is a protobuf document whose body text is
+    one long UTF-8 string; walking the wire format recovers it exactly
+    without a protobuf dependency.
+    """
+    return _longest_text_field(zlib.decompress(zdata, 15 + 32)).strip()
+
+
+class NotesPublisher:
+    """Turns recent Apple Notes into Jekyll posts in this repository."""
+
+    def __init__(self, repo_path='.'):
+        self.repo_path = Path(repo_path).resolve()
+        self.posts_dir = self.repo_path / '_posts'
+        self.assets_dir = self.repo_path / 'assets' / 'images'
+        self.posts_dir.mkdir(parents=True, exist_ok=True)
+        self.assets_dir.mkdir(parents=True, exist_ok=True)
+        # Asset files written during the current publish run, so git can
+        # stage them explicitly alongside the posts.
+        self._copied_assets = []
+        # Per-run memo of source path -> asset URL for repeat references.
+        self._copy_cache = {}
+        # Sidecar cache mapping source path -> [size, mtime_ns, asset name]
+        # so unchanged attachments skip the hash and the copy entirely.
+        self._img_cache_path = self.assets_dir / '.cache.json'
+        try:
+            self._img_cache = json.loads(self._img_cache_path.read_text())
+        except (OSError, ValueError):
+            self._img_cache = {}
+        # Attachment copies are independent I/O; the GIL is released in
+        # open/read/write and inside the digest loop, so threads overlap.
+        self._pool = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) * 2))
+
+    def _fetch_notes(self):
+        """Yield notes as the AppleScript emits them, one record at a time.
+
+        The script logs each record as soon as Notes.app hands the note
+        over, so parsing and image copying here overlap the (slow)
+        enumeration on the AppleScript side instead of waiting for the
+        whole batch to buffer. The pipe is consumed as raw bytes: record
+        framing is found with bytes.find and only the individual fields
+        are UTF-8 decoded, so megabytes of body text are never decoded a
+        second time by a text-mode wrapper.
+        """
+        proc = subprocess.Popen(
+            ['osascript', '-e', _FETCH_SCRIPT],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        # osascript's `log` goes to stderr, one record per call.
+        buf = b''
+        for chunk in iter(lambda: proc.stderr.read(4096), b''):
+            buf += chunk
+            while True:
+                end = buf.find(_RECORD_SEP)
+                if end < 0:
+                    break
+                record, buf = buf[:end], buf[end + 1:]
+                fields = record.strip(b'\n').split(_FIELD_SEP)
+                if len(fields) != 3:
+                    continue
+                title, body, modified = fields
+                yield {
+                    'title': title.decode('utf-8'),
+                    'content': body.decode('utf-8'),
+                    'modified_date': datetime.fromisoformat(modified.decode('ascii')),
+                }
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+    def get_recent_notes(self):
+        """Fetch notes modified in the last week, without attachments."""
+        return self._fetch_notes()
+
+    def get_notes_with_images(self):
+        """Fetch notes modified in the last week, including attachment paths.
+
+        Reads NoteStore.sqlite directly instead of enumerating
+        `attachments of theNote` over the scripting bridge, which costs
+        hundreds of milliseconds of IPC per note. The store is opened
+        read-only so a concurrently running Notes.app is unaffected.
+        """
+        store = Path(_NOTE_STORE).expanduser()
+        con = sqlite3.connect(f'file:{store}?mode=ro', uri=True)
+        try:
+            # Deleting a note bumps its modification date, so without the
+            # ZMARKEDFORDELETION filter a recent deletion would be
+            # republished. Locked notes are excluded too; their bodies
+            # are encrypted and must not reach the public site.
+            notes = con.execute(
+                "SELECT o.Z_PK, o.ZTITLE1, d.ZDATA, o.ZMODIFICATIONDATE1"
+                " FROM ZICCLOUDSYNCINGOBJECT o"
+                " JOIN ZICNOTEDATA d ON d.Z_PK = o.ZNOTEDATA"
+                " WHERE o.ZMODIFICATIONDATE1 >"
+                "       strftime('%s', 'now', '-7 days') - ?"
+                "   AND IFNULL(o.ZMARKEDFORDELETION, 0) = 0"
+                "   AND IFNULL(o.ZISPASSWORDPROTECTED, 0) = 0",
+                (_APPLE_EPOCH,),
+            ).fetchall()
+            for pk, title, zdata, modified in notes:
+                try:
+                    content = _extract_note_text(zdata) if zdata else ''
+                except zlib.error:
+                    # Locked or partially synced rows carry ZDATA that is
+                    # not a gzip stream; skip the note rather than abort
+                    # the whole publish.
+                    continue
+                attachments = con.execute(
+                    "SELECT m.ZIDENTIFIER, m.ZFILENAME"
+                    " FROM ZICCLOUDSYNCINGOBJECT a"
+                    " JOIN ZICCLOUDSYNCINGOBJECT m ON m.Z_PK = a.ZMEDIA"
+                    " WHERE a.ZNOTE = ? AND m.ZFILENAME IS NOT NULL",
+                    (pk,),
+                ).fetchall()
+                images = []
+                for identifier, filename in attachments:
+                    images.extend(
+                        str(p) for p in store.parent.glob(
+                            f'Accounts/*/Media/{identifier}/{filename}')
+                    )
+                yield {
+                    'title': title or 'Untitled',
+                    'content': content,
+                    'images': images,
+                    'modified_date': datetime.fromtimestamp(modified + _APPLE_EPOCH),
+                }
+        finally:
+            con.close()
+
+    def process_content(self, content, images=None):
+        """Convert Apple Notes conventions to Markdown.
+
+        Returns the converted body and the list of hashtags found in it.
+        """
+        tags = []
+
+        def _dispatch(match):
+            kind = match.lastgroup
+            text = match.group()
+            if kind == 'num':
+                return text.split('.', 1)[0] + '. '
+            if kind == 'ital':
+                return '*' + text[1:-1] + '*'
+            if kind == 'bold':
+                return '**' + text[1:-1] + '**'
+            # kind == 'tag': record it and strip it from the body.
+            tags.append(text.lstrip()[1:])
+            return ''
+
+        # Literal rewrites first: str.replace/translate are tight C loops,
+        # no regex engine involved. Notes uses a space after bullets, tab
+        # occasionally.
+        content = content.translate(_CHECKBOX_MAP)
+        content = content.replace('• ', '* ').replace('•\t', '* ')
+        content = _FUSED_RE.sub(_dispatch, content)
+        # A note repeating #todo ten times should tag the post once.
+        tags = list(dict.fromkeys(tags))
+
+        if images:
+            futures = [self._pool.submit(self.copy_image_to_assets, p) for p in images]
+            processed_images = [f'![Image]({url})'
+                                for url in (f.result() for f in futures) if url]
+            if processed_images:
+                content = content + '\n\n' + '\n'.join(processed_images)
+
+        return content, tags
+
+    def copy_image_to_assets(self, image_path):
+        """Copy an attachment into assets/images/ under a content-hashed name.
+
+        Returns the site-relative URL of the copied asset, or None if the
+        source could not be copied. Repeat references to the same source
+        within a run (shared images across notes) come straight out of an
+        in-memory memo without touching the filesystem again.
+        """
+        try:
+            return self._copy_cache[image_path]
+        except KeyError:
+            url = self._copy_image(image_path)
+            self._copy_cache[image_path] = url
+            return url
+
+    def _copy_image(self, image_path):
+        ext = os.path.splitext(image_path)[1].lower()
+        if ext not in _IMG_EXTS:
+            return None
+
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+
+        cached = self._img_cache.get(str(image_path))
+        if (cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns
+                and (self.assets_dir / cached[2]).exists()):
+            return f'/assets/images/{cached[2]}'
+
+        # Stream the digest; mixing in time.time() defeated dedup by
+        # giving identical images different names on every run.
+        with open(image_path, 'rb') as f:
+            file_hash = hashlib.file_digest(f, 'blake2b').hexdigest()[:10]
+
+        new_name = f'{file_hash}{ext}'
+        new_path = self.assets_dir / new_name
+
+        # One stat answers both "exists" and "non-empty".
+        try:
+            if os.stat(new_path).st_size > 0:
+                self._img_cache[str(image_path)] = [st.st_size, st.st_mtime_ns, new_name]
+                return f'/assets/images/{new_name}'
+        except OSError:
+            pass
+
+        try:
+            shutil.copyfile(image_path, new_path)
+        except OSError:
+            return None
+        self._copied_assets.append(new_path)
+        self._img_cache[str(image_path)] = [st.st_size, st.st_mtime_ns, new_name]
+        return f'/assets/images/{new_name}'
+
+    def create_markdown_post(self, note):
+        """Write one note out as a Jekyll post and return its path.
+
+        Returns None without touching the file when the post on disk is
+        already identical, so steady-state republishes do no writes and
+        stage nothing. Dating the post from the note's modification date
+        (rather than the publish time) is what makes the regenerated
+        bytes stable between runs.
+        """
+        title = note['title']
+        content, tags = self.process_content(note['content'], note.get('images'))
+
+        slug = _SLUG_RE.sub('-', title.lower()).strip('-')
+
+        modified = note['modified_date']
+        file_path = self.posts_dir / f'{modified.strftime("%Y-%m-%d")}-{slug}.md'
+
+        # Single join, single allocation; no per-field __format__ dispatch.
+        front_matter = ''.join((
+            '---\nlayout: post\ntitle: "', title,
+            '"\ndate: ', modified.strftime('%Y-%m-%d %H:%M:%S'),
+            '\ntags: [', ', '.join(tags),
+            ']\n---\n\n', content, '\n',
+        ))
+
+        new_bytes = front_matter.encode('utf-8')
+        new_digest = hashlib.blake2b(new_bytes, digest_size=16).digest()
+        try:
+            existing = file_path.read_bytes()
+            if hashlib.blake2b(existing, digest_size=16).digest() == new_digest:
+                return None
+        except FileNotFoundError:
+            pass
+        file_path.write_bytes(new_bytes)
+        return file_path
+
+    def publish_notes(self):
+        """Fetch recent notes, write them as posts, and push to the site."""
+        # One timestamp for the whole run; no per-note clock reads.
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        published_files = []
+        self._copied_assets = []
+        self._copy_cache = {}
+        for note in self.get_notes_with_images():
+            file_path = self.create_markdown_post(note)
+            if file_path is None:
+                continue
+            published_files.append(file_path)
+            print(f'Published: {file_path.name}')
+
+        self._img_cache_path.write_text(json.dumps(self._img_cache))
+
+        if not published_files and not self._copied_assets:
+            print('Nothing to publish.')
+            return
+
+        # Stage only what we wrote; `git add .` stats the whole site tree.
+        # -C/cwd keep the repo path out of process-global state.
+        rel_paths = [str(p.relative_to(self.repo_path))
+                     for p in published_files + self._copied_assets]
+        subprocess.run(
+            ['git', '-C', str(self.repo_path), 'add', '--', *rel_paths],
+            check=True,
+        )
+        message = f'Publish notes {timestamp}'
+        subprocess.run(
+            f'git commit -m {shlex.quote(message)} && git push',
+            shell=True, check=True, cwd=self.repo_path,
+        )
+        print(f'Pushed {len(published_files)} post(s).')
+
+
+if __name__ == '__main__':
+    NotesPublisher().publish_notes()